@@ -22,8 +22,20 @@
 """This module contains extensions and utility functions for the cubit python
 interface."""
 
+import importlib
+
 from cubitpy.conf import cupy
-from cubitpy.cubitpy import CubitPy
+
+# Objects that are only imported once they are accessed for the first time.
+# Importing them pulls in the cubit wrapper (and with it execnet, numpy,
+# netCDF4 and fourcipp), which is not required for e.g. only using the
+# options in cupy.
+_LAZY_IMPORTS = {
+    "CubitPy": "cubitpy.cubitpy",
+    "CubitConnect": "cubitpy.cubit_wrapper.cubit_wrapper_host",
+    "CubitObject": "cubitpy.cubit_wrapper.cubit_wrapper_host",
+    "get_surface_center": "cubitpy.cubit_utility",
+}
 
 # Define the items that will be exported by default.
 __all__ = [
@@ -32,3 +44,17 @@ __all__ = [
     # Cubit objects.
     "CubitPy",
 ]
+
+
+def __getattr__(name):
+    """Import the lazy objects on first access."""
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """Also list the lazy objects, e.g., for auto completion."""
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
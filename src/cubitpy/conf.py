@@ -22,6 +22,7 @@
 """This module defines a global object that manages all kind of stuff regarding
 cubitpy."""
 
+import functools
 import getpass
 import glob
 import os
@@ -36,12 +37,36 @@ from cubitpy.cubitpy_types import (
     GeometryType,
 )
 
+# Default tolerance for geometry, the tolerance used by cubitpy is
+# cupy.eps_pos.
+EPS_POS = 1e-10
+
+
+# Paths (together with their test functions) that passed the check in
+# _is_valid_path.
+_valid_paths = set()
+
+
+def _is_valid_path(path, test_function):
+    """Check if the path passes the test function.
+
+    Only valid paths are stored, as the paths checked here are not
+    expected to be removed during a session. Paths that do not exist
+    yet are checked again, as they might be created later on.
+    """
+    if (path, test_function) in _valid_paths:
+        return True
+    if test_function(path):
+        _valid_paths.add((path, test_function))
+        return True
+    return False
+
 
 def get_path(environment_variable, test_function, *, throw_error=True):
     """Check if he environment variable is set and the path exits."""
-    if environment_variable in os.environ.keys():
-        if test_function(os.environ[environment_variable]):
-            return os.environ[environment_variable]
+    path = os.environ.get(environment_variable)
+    if path is not None and _is_valid_path(path, test_function):
+        return path
 
     # No valid path found or given.
     if throw_error:
@@ -50,19 +75,47 @@ def get_path(environment_variable, test_function, *, throw_error=True):
         return None
 
 
+@functools.lru_cache(maxsize=None)
+def _find_coreform_python_interpreter(cubit_root):
+    """Search the cubit root directory for the python interpreter shipped with
+    Coreform.
+
+    This searches the whole installation, therefore the result is
+    cached.
+    """
+    pattern = "**/python3"
+    full_pattern = os.path.join(cubit_root, pattern)
+    python3_matches = glob.glob(full_pattern, recursive=True)
+    python3_files = [path for path in python3_matches if os.path.isfile(path)]
+    if not len(python3_files) == 1:
+        raise ValueError("Could not find the path to the cubit python interpreter")
+    return python3_files[0]
+
+
 class CubitOptions(object):
     """Object for types in cubitpy."""
 
+    __slots__ = (
+        "_temp_dir",
+        "_temp_dir_created",
+        "_temp_log",
+        "geometry",
+        "finite_element_object",
+        "element_type",
+        "cubit_items",
+        "bc_type",
+        "eps_pos",
+    )
+
     def __init__(self):
-        # Temporary directory for cubitpy.
-        self.temp_dir = os.path.join(
-            "/tmp/cubitpy_{}".format(getpass.getuser()),  # nosec
-            "pid_{}".format(os.getpid()),
-        )
-        self.temp_log = os.path.join(self.temp_dir, "cubitpy.log")
+        # Temporary directory for cubitpy. This is only set (and created) once
+        # it is accessed for the first time.
+        self._temp_dir = None
+        self._temp_dir_created = False
 
-        # Check if temp path exits, if not create it.
-        os.makedirs(self.temp_dir, exist_ok=True)
+        # Path to the temporary log file of cubit. Per default it is in the
+        # temporary directory.
+        self._temp_log = None
 
         # Geometry types.
         self.geometry = GeometryType
@@ -80,7 +133,47 @@ class CubitOptions(object):
         self.bc_type = BoundaryConditionType
 
         # Tolerance for geometry.
-        self.eps_pos = 1e-10
+        self.eps_pos = EPS_POS
+
+    def _ensure_temp_dir(self):
+        """Set the path to the temporary directory and create it if it does
+        not exist."""
+        if self._temp_dir is None:
+            self._temp_dir = os.path.join(
+                "/tmp/cubitpy_{}".format(getpass.getuser()),  # nosec
+                "pid_{}".format(os.getpid()),
+            )
+        if not self._temp_dir_created:
+            os.makedirs(self._temp_dir, exist_ok=True)
+            self._temp_dir_created = True
+        return self._temp_dir
+
+    @property
+    def temp_dir(self):
+        """Temporary directory for cubitpy."""
+        return self._ensure_temp_dir()
+
+    @temp_dir.setter
+    def temp_dir(self, path):
+        """Set the temporary directory, it is created once it is accessed."""
+        self._temp_dir = path
+        self._temp_dir_created = False
+
+    @property
+    def temp_log(self):
+        """Path to the temporary log file of cubit."""
+        if self._temp_log is not None:
+            return self._temp_log
+        return os.path.join(self._ensure_temp_dir(), "cubitpy.log")
+
+    @temp_log.setter
+    def temp_log(self, path):
+        """Set the path to the temporary log file of cubit.
+
+        If this is set to None, the log file in the temporary directory
+        is used.
+        """
+        self._temp_log = path
 
     @staticmethod
     def get_cubit_root_path(**kwargs):
@@ -124,16 +217,7 @@ class CubitOptions(object):
         """Get the path to the python interpreter to be used for CubitPy."""
         cubit_root = cls.get_cubit_root_path()
         if cls.is_coreform():
-            pattern = "**/python3"
-            full_pattern = os.path.join(cubit_root, pattern)
-            python3_matches = glob.glob(full_pattern, recursive=True)
-            python3_files = [path for path in python3_matches if os.path.isfile(path)]
-            if not len(python3_files) == 1:
-                raise ValueError(
-                    "Could not find the path to the cubit python interpreter"
-                )
-            cubit_python_interpreter = python3_files[0]
-            return cubit_python_interpreter
+            return _find_coreform_python_interpreter(cubit_root)
         else:
             python2_path_env = get_path(
                 "CUBITPY_PYTHON2", os.path.isfile, throw_error=False
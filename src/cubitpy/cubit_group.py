@@ -21,9 +21,32 @@
 # THE SOFTWARE.
 """This file contains a class to represent groups in cubit."""
 
+from collections import defaultdict
+
 from cubitpy.conf import cupy
+from cubitpy.cubit_utility import get_id_string
 from cubitpy.cubit_wrapper.cubit_wrapper_host import CubitObject
 
+# Names of the cubit functions that return the IDs of a certain item type in a
+# group.
+_GROUP_ITEM_FUNCTIONS = {
+    # Geometry items.
+    cupy.geometry.vertex: "get_group_vertices",
+    cupy.geometry.curve: "get_group_curves",
+    cupy.geometry.surface: "get_group_surfaces",
+    cupy.geometry.volume: "get_group_volumes",
+    # Finite element items.
+    cupy.finite_element_object.node: "get_group_nodes",
+    cupy.finite_element_object.edge: "get_group_edges",
+    cupy.finite_element_object.face: "get_group_quads",
+    cupy.finite_element_object.triangle: "get_group_tris",
+    cupy.finite_element_object.tet: "get_group_tets",
+    cupy.finite_element_object.hex: "get_group_hexes",
+    cupy.finite_element_object.wedge: "get_group_wedges",
+    # Cubit items.
+    cupy.cubit_items.group: "get_group_groups",
+}
+
 
 class CubitGroup(object):
     """This object helps to represent groups in cubit."""
@@ -72,7 +95,7 @@ class CubitGroup(object):
                     raise ValueError(
                         'The given group name "{}" already exists!'.format(self.name)
                     )
-                cubit.cmd("group {} rename '{}'".format(self._id, self.name))
+                cubit.cmd(f"group {self._id} rename '{self.name}'")
 
             if add_value is not None:
                 self.add(add_value)
@@ -119,28 +142,89 @@ class CubitGroup(object):
                 Add this list of cubit objects.
         """
 
-        if isinstance(add_value, str):
-            self.cubit.cmd("group {} {}".format(self._id, add_value))
-        elif isinstance(add_value, CubitObject):
-            self.cubit.add_entity_to_group(
-                self._id,
-                add_value.id(),
-                add_value.get_geometry_type().get_cubit_string(),
-            )
-        elif isinstance(add_value, list):
-            for item in add_value:
+        # Get the add function via the exact type of the value, only for
+        # derived types we have to check the instances.
+        add_function = self._add_functions.get(type(add_value))
+        if add_function is None:
+            for add_type, function in self._add_functions.items():
+                if isinstance(add_value, add_type):
+                    add_function = function
+                    break
+            else:
+                raise TypeError("Got wrong type {}!".format(type(add_value)))
+        add_function(self, add_value)
+
+    def _add_string(self, add_value):
+        """Execute a string in cubit that adds items to this group."""
+        self.cubit.cmd(f"group {self._id} {add_value}")
+
+    def _add_cubit_object(self, add_value):
+        """Add a single cubit object to this group."""
+        self._add_cubit_objects([add_value])
+
+    def _add_cubit_objects(self, cubit_objects):
+        """Add cubit objects to this group.
+
+        The IDs of all cubit objects are queried with a single call to
+        cubit and collected per geometry type, so they can be added with
+        a single command for each type.
+        """
+        if not cubit_objects:
+            return
+
+        item_ids = self.cubit.call_batch([[item, "id", []] for item in cubit_objects])
+        geometry_ids = defaultdict(list)
+        for item, item_id in zip(cubit_objects, item_ids):
+            geometry_ids[item.get_geometry_type().get_cubit_string()].append(item_id)
+        self.cubit.call_batch(
+            [
+                [
+                    self.cubit.cubit,
+                    "cmd",
+                    [f"group {self._id} add {geometry_string} {get_id_string(ids)}"],
+                ]
+                for geometry_string, ids in geometry_ids.items()
+            ]
+        )
+
+    def _add_list(self, add_value):
+        """Add a list of items to this group.
+
+        Consecutive cubit objects are added together. All other items
+        are added in between, so the items are added in the given order.
+        """
+
+        cubit_objects = []
+        for item in add_value:
+            if isinstance(item, CubitObject):
+                cubit_objects.append(item)
+            else:
+                self._add_cubit_objects(cubit_objects)
+                cubit_objects = []
                 self.add(item)
-        else:
-            raise TypeError("Got wrong type {}!".format(type(add_value)))
+        self._add_cubit_objects(cubit_objects)
+
+    # Functions to add the different types of values to the group.
+    _add_functions = {
+        str: _add_string,
+        CubitObject: _add_cubit_object,
+        list: _add_list,
+    }
 
     def get_geometry_type(self):
         """Return the geometry type of this group.
 
         This only works if the group contains a single type of geometry
-        of finite element objects.
+        of finite element objects. The group can also be changed
+        directly in cubit, so the type is evaluated for each call.
         """
+        return self._get_geometry_type_from_items(self.get_item_ids())
+
+    @staticmethod
+    def _get_geometry_type_from_items(group_items):
+        """Return the geometry type for the items of a group, as returned by
+        get_item_ids."""
 
-        group_items = self.get_item_ids()
         group_keys = [key for key in group_items if len(group_items[key]) > 0]
         if not len(group_keys) == 1:
             raise TypeError("Got wrong types in get_geometry_type")
@@ -172,61 +256,44 @@ class CubitGroup(object):
 
     def get_item_ids_from_type(self, item_type):
         """Get the IDs of a certain type of item in this group."""
-
-        # Geometry items.
-        if item_type == cupy.geometry.vertex:
-            return self.cubit.get_group_vertices(self._id)
-        elif item_type == cupy.geometry.curve:
-            return self.cubit.get_group_curves(self._id)
-        elif item_type == cupy.geometry.surface:
-            return self.cubit.get_group_surfaces(self._id)
-        elif item_type == cupy.geometry.volume:
-            return self.cubit.get_group_volumes(self._id)
-
-        # Finite element items.
-        elif item_type == cupy.finite_element_object.node:
-            return self.cubit.get_group_nodes(self._id)
-        elif item_type == cupy.finite_element_object.edge:
-            return self.cubit.get_group_edges(self._id)
-        elif item_type == cupy.finite_element_object.face:
-            return self.cubit.get_group_quads(self._id)
-        elif item_type == cupy.finite_element_object.triangle:
-            return self.cubit.get_group_tris(self._id)
-        elif item_type == cupy.finite_element_object.tet:
-            return self.cubit.get_group_tets(self._id)
-        elif item_type == cupy.finite_element_object.hex:
-            return self.cubit.get_group_hexes(self._id)
-        elif item_type == cupy.finite_element_object.wedge:
-            return self.cubit.get_group_wedges(self._id)
-
-        # Cubit items.
-        elif item_type == cupy.cubit_items.group:
-            return self.cubit.get_group_groups(self._id)
-
-        else:
+        try:
+            function_name = _GROUP_ITEM_FUNCTIONS[item_type]
+        except KeyError:
             raise TypeError("Wrong item type.")
+        return getattr(self.cubit, function_name)(self._id)
 
     def _get_item_ids(self, group_items):
         """Add all items in this group to group_items.
 
-        Also add all items of contained subgroups.
+        Also add all items of contained subgroups. The items of all
+        groups on the same level are queried with a single call to
+        cubit.
         """
 
-        # Add entries from subgroups.
-        sub_groups = [
-            self.cubit.group(group_id=group_id)
-            for group_id in self.get_item_ids_from_type(cupy.cubit_items.group)
+        item_types = [
+            cupy.cubit_items.group,
+            *cupy.geometry,
+            *cupy.finite_element_object,
         ]
-        for sub_group in sub_groups:
-            sub_group._get_item_ids(group_items)
-
-        # Add entries from this group.
-        for geometry_type in cupy.geometry:
-            group_items[geometry_type].extend(
-                self.get_item_ids_from_type(geometry_type)
+        group_ids = [self._id]
+        while group_ids:
+            item_ids = self.cubit.call_batch(
+                [
+                    [self.cubit.cubit, _GROUP_ITEM_FUNCTIONS[item_type], [group_id]]
+                    for group_id in group_ids
+                    for item_type in item_types
+                ]
             )
-        for fe_object in cupy.finite_element_object:
-            group_items[fe_object].extend(self.get_item_ids_from_type(fe_object))
+
+            # Add the entries of the groups on this level and get the
+            # subgroups for the next level.
+            group_ids = []
+            for i_call, ids in enumerate(item_ids):
+                item_type = item_types[i_call % len(item_types)]
+                if item_type == cupy.cubit_items.group:
+                    group_ids.extend(ids)
+                else:
+                    group_items[item_type].extend(ids)
 
     def get_item_ids(self):
         """Get a dictionary with the IDs of all entries in this group, this
@@ -260,28 +327,30 @@ class CubitGroup(object):
             Type of the finite elements.
         """
 
-        self_geometry = self.get_geometry_type()
+        # The items are queried only once, the geometry type is evaluated from
+        # them.
+        group_items = self.get_item_ids()
+        self_geometry = self._get_geometry_type_from_items(group_items)
         if (
             self_geometry != cupy.geometry.surface
             and self_geometry != cupy.geometry.volume
         ):
             raise NotImplementedError("This case is not implemented")
 
-        group_items = self.get_item_ids()
         cubit_scheme, cubit_element_type = el_type.get_cubit_names()
 
-        # Set element type and meshing scheme for each geometry item in the group.
+        # Set element type and meshing scheme for each geometry item in the
+        # group and add the group to the block, all with a single call to cubit.
+        commands = []
         for i in group_items[self_geometry]:
-            self.cubit.cmd(
-                "{} {} scheme {}".format(
-                    self_geometry.get_cubit_string(), i, cubit_scheme
-                )
+            commands.append(
+                f"{self_geometry.get_cubit_string()} {i} scheme {cubit_scheme}"
             )
-            self.cubit.cmd(
-                "block {} element type {}".format(block_id, cubit_element_type)
-            )
-
-        self.cubit.cmd(f"block {block_id} add group {self._id}")
+            commands.append(f"block {block_id} element type {cubit_element_type}")
+        commands.append(f"block {block_id} add group {self._id}")
+        self.cubit.call_batch(
+            [[self.cubit.cubit, "cmd", [command]] for command in commands]
+        )
 
     def add_to_nodeset(self, nodeset_id):
         """Add the nodes from this geometry to a node set.
@@ -293,25 +362,41 @@ class CubitGroup(object):
             added to.
         """
 
+        # Get all nodes that are part of faces and elements. The connectivities
+        # of all items are queried with a single call to cubit.
+        group_items = self.get_item_ids()
+        connectivities = self.cubit.call_batch(
+            [
+                [
+                    self.cubit.cubit,
+                    "get_connectivity",
+                    [mesh_item.get_cubit_string(), i],
+                ]
+                for mesh_item in cupy.finite_element_object
+                for i in group_items[mesh_item]
+            ]
+        )
+
         # Add this group. This will add all geometry and directly contained
         # nodes in this group. If there are elements in this group, there will
         # be a warning. This warning is explicitly deactivated here.
-        self.cubit.cmd("set warning off")
-        self.cubit.cmd("nodeset {} group {}".format(nodeset_id, self._id))
-        self.cubit.cmd("set warning on")
-
-        # Add all nodes that are part of faces and elements to the node set.
-        group_items = self.get_item_ids()
-        nodes = []
-        for mesh_item in cupy.finite_element_object:
-            for i in group_items[mesh_item]:
-                nodes.extend(
-                    self.cubit.get_connectivity(mesh_item.get_cubit_string(), i)
-                )
+        commands = [
+            "set warning off",
+            f"nodeset {nodeset_id} group {self._id}",
+            "set warning on",
+        ]
 
-        # Add all nodes to the node set.
-        for i_node in nodes:
-            self.cubit.cmd("nodeset {} node {}".format(nodeset_id, i_node))
+        # Add all nodes to the node set with a single command. The nodes are
+        # sorted, so consecutive IDs can be combined to ranges in the command.
+        # All commands are sent to cubit with a single call.
+        nodes = sorted(
+            {i_node for connectivity in connectivities for i_node in connectivity}
+        )
+        if nodes:
+            commands.append(f"nodeset {nodeset_id} node {get_id_string(nodes)}")
+        self.cubit.call_batch(
+            [[self.cubit.cubit, "cmd", [command]] for command in commands]
+        )
 
     def get_name(self, set_type):
         """Return the name for this set to be used in cubit.
@@ -346,7 +431,7 @@ class CubitGroup(object):
     def id(self):
         """Return the string with all ids of the types in this object."""
         id_list = self.get_item_ids_from_type(self.get_geometry_type())
-        return " ".join(map(str, id_list))
+        return get_id_string(id_list)
 
     def __str__(self, *args, **kwargs):
         """The string representation of a group is its name."""
@@ -24,7 +24,6 @@ be used with 4C."""
 
 import os
 
-import netCDF4
 import numpy as np
 
 from cubitpy.conf import cupy
@@ -42,14 +41,16 @@ def add_node_sets(
 
     # Get a mapping between the node set IDs and the node set names and keys in the exo file.
     node_set_id_to_exo_name = {}
+    # The variables are read from the exo file once, and not for each set.
     node_set_keys = [key for key in exo.variables.keys() if "node_ns" in key]
-    for i in range(len(exo.variables["ns_prop1"])):
-        node_set_id = int(exo.variables["ns_prop1"][i])
+    exo_node_set_ids = exo.variables["ns_prop1"][:]
+    exo_node_set_names = exo.variables["ns_names"][:]
+    for i in range(len(exo_node_set_ids)):
+        node_set_id = int(exo_node_set_ids[i])
         node_set_key = node_set_keys[i]
-        node_set_name = ""
-        for char in exo.variables["ns_names"][i]:
-            if isinstance(char, np.bytes_):
-                node_set_name += char.decode("UTF-8")
+        node_set_name = b"".join(
+            char for char in exo_node_set_names[i] if isinstance(char, np.bytes_)
+        ).decode("UTF-8")
         node_set_id_to_exo_name[node_set_id] = {
             "key": node_set_key,
             "name": node_set_name,
@@ -95,18 +96,21 @@ def add_node_sets(
         ]
         for geo, section_name, set_label in name_geometry_tuple:
             if len(node_sets[geo]) > 0:
-                input_file[section_name] = []
+                # The entries of all sets are collected first and then added
+                # to the input file at once.
+                topology = []
                 for i_set, node_set in enumerate(node_sets[geo]):
                     node_set.sort()
-                    for i_node in node_set:
-                        input_file[section_name].append(
-                            {
-                                "type": "NODE",
-                                "node_id": i_node,
-                                "d_type": set_label,
-                                "d_id": i_set + 1,
-                            }
-                        )
+                    topology.extend(
+                        {
+                            "type": "NODE",
+                            "node_id": i_node,
+                            "d_type": set_label,
+                            "d_id": i_set + 1,
+                        }
+                        for i_node in node_set
+                    )
+                input_file[section_name] = topology
 
 
 def add_exodus_geometry_section(cubit, input_file, rel_exo_file_path):
@@ -156,54 +160,69 @@ def add_exodus_geometry_section(cubit, input_file, rel_exo_file_path):
         )
 
 
-def get_element_connectivity_list(connectivity):
-    """Return the connectivity list for an element.
+# For hex27 elements 4C expects a different node ordering than the one we get
+# from cubit.
+_HEX27_ORDERING = [
+    0,
+    1,
+    2,
+    3,
+    4,
+    5,
+    6,
+    7,
+    8,
+    9,
+    10,
+    11,
+    12,
+    13,
+    14,
+    15,
+    16,
+    17,
+    18,
+    19,
+    21,
+    25,
+    24,
+    26,
+    23,
+    22,
+    20,
+]
+
+
+def get_block_connectivity_list(block_connectivity):
+    """Return the connectivity lists for all elements in a block.
 
     For hex27 we need a different ordering than the one we get from
-    cubit.
+    cubit. The whole block is converted at once.
     """
 
-    if len(connectivity) == 27:
+    if block_connectivity.shape[1] == 27:
         # hex27
-        ordering = [
-            0,
-            1,
-            2,
-            3,
-            4,
-            5,
-            6,
-            7,
-            8,
-            9,
-            10,
-            11,
-            12,
-            13,
-            14,
-            15,
-            16,
-            17,
-            18,
-            19,
-            21,
-            25,
-            24,
-            26,
-            23,
-            22,
-            20,
-        ]
-        return [connectivity[i] for i in ordering]
+        return block_connectivity[:, _HEX27_ORDERING].tolist()
     else:
         # all other elements
-        return connectivity.tolist()
+        return block_connectivity.tolist()
+
+
+def get_element_connectivity_list(connectivity):
+    """Return the connectivity list for an element.
+
+    For hex27 we need a different ordering than the one we get from
+    cubit.
+    """
+    return get_block_connectivity_list(connectivity[np.newaxis, :])[0]
 
 
 def get_input_file_with_mesh(cubit):
     """Return a copy of cubit.fourc_input with mesh data (nodes and elements)
     added."""
 
+    import netCDF4
+
     # Create exodus file
     os.makedirs(cupy.temp_dir, exist_ok=True)
     exo_path = os.path.join(cupy.temp_dir, "cubitpy.exo")
@@ -216,7 +235,6 @@ def get_input_file_with_mesh(cubit):
     add_node_sets(cubit, exo, input_file)
 
     # Add the nodal data
-    input_file["NODE COORDS"] = []
     if "coordz" in exo.variables:
         coordinates = np.array(
             [exo.variables["coord" + dim][:] for dim in ["x", "y", "z"]],
@@ -225,14 +243,16 @@ def get_input_file_with_mesh(cubit):
         temp = [exo.variables["coord" + dim][:] for dim in ["x", "y"]]
         temp.append([0 for i in range(len(temp[0]))])
         coordinates = np.array(temp).transpose()
-    for i, coordinate in enumerate(coordinates):
-        input_file["NODE COORDS"].append(
-            {
-                "COORD": [coordinate[0], coordinate[1], coordinate[2]],
-                "data": {"type": "NODE"},
-                "id": i + 1,
-            }
-        )
+    # The coordinates are converted to python lists at once, which is much
+    # faster than accessing the numpy array entry by entry.
+    input_file["NODE COORDS"] = [
+        {
+            "COORD": coordinate,
+            "data": {"type": "NODE"},
+            "id": i + 1,
+        }
+        for i, coordinate in enumerate(coordinates.tolist())
+    ]
 
     # Add the element connectivity
     connectivity_keys = [key for key in exo.variables.keys() if "connect" in key]
@@ -244,19 +264,25 @@ def get_input_file_with_mesh(cubit):
         block_section = f"{ele_type.get_four_c_section()} ELEMENTS"
         if block_section not in input_file.sections.keys():
             input_file[block_section] = []
-        for connectivity in exo.variables[key][:]:
-            input_file[block_section].append(
-                {
-                    "id": i_element + 1,
-                    "cell": {
-                        "connectivity": get_element_connectivity_list(connectivity),
-                        "type": ele_type.get_four_c_type(),
-                    },
-                    "data": {
-                        "type": ele_type.get_four_c_name(),
-                        **block_dict,
-                    },
-                }
-            )
-            i_element += 1
+
+        # These values are the same for all elements in this block.
+        four_c_type = ele_type.get_four_c_type()
+        four_c_name = ele_type.get_four_c_name()
+
+        block_connectivity = get_block_connectivity_list(exo.variables[key][:])
+        input_file[block_section].extend(
+            {
+                "id": i_element + i_block_element + 1,
+                "cell": {
+                    "connectivity": connectivity,
+                    "type": four_c_type,
+                },
+                "data": {
+                    "type": four_c_name,
+                    **block_dict,
+                },
+            }
+            for i_block_element, connectivity in enumerate(block_connectivity)
+        )
+        i_element += len(block_connectivity)
     return input_file
@@ -21,29 +21,63 @@
 # THE SOFTWARE.
 """Utility functions for the use of cubitpy."""
 
-from cubitpy.conf import cupy
+import numpy as np
+
+# Lists with more IDs than this are converted to the cubit range syntax in
+# get_id_string.
+ID_RANGE_THRESHOLD = 16
 
 
 def get_surface_center(surf):
     """Get a 3D point that has the local coordinated on the surface of (0,0),
     with the parameter space being ([-1,1],[-1,1])."""
 
-    if not surf.get_geometry_type() == cupy.geometry.surface:
+    # Directly check for a surface, this requires a single call to cubit,
+    # compared to up to four calls in get_geometry_type.
+    if not surf.isinstance("cubitpy_surface"):
         raise TypeError("Did not expect {}".format(type(surf)))
 
-    range_u = surf.get_param_range_U()
-    u = 0.5 * (range_u[1] + range_u[0])
-    range_v = surf.get_param_range_V()
-    v = 0.5 * (range_v[1] + range_v[0])
-    return surf.position_from_u_v(u, v)
+    # Get both parameter ranges with a single call to cubit.
+    (u_start, u_end), (v_start, v_end) = surf.cubit_connect.call_batch(
+        [[surf, "get_param_range_U", []], [surf, "get_param_range_V", []]]
+    )
+    return surf.position_from_u_v(0.5 * (u_start + u_end), 0.5 * (v_start + v_end))
 
 
 def import_fluent_geometry(cubit, file, feature_angle=135):
     """Import fluent mesh geometry in cubit from file with according
     feature_angle."""
 
-    cubit.cmd(
-        'import fluent mesh geometry  "{}" feature_angle {} '.format(
-            file, feature_angle
-        )
+    cubit.cmd(f'import fluent mesh geometry  "{file}" feature_angle {feature_angle} ')
+
+
+def get_id_string(ids):
+    """Return a string with the given IDs, as it can be used in cubit
+    commands.
+
+    The conversion to strings is done with numpy, which is considerably
+    faster than converting each ID in python for large lists of IDs. For
+    more than ID_RANGE_THRESHOLD IDs, runs of consecutive IDs are combined
+    with the cubit range syntax, e.g., "1 to 100 105 200 to 300". The IDs
+    are neither sorted nor are duplicates removed, so the string always
+    contains the IDs in the given order.
+
+    Args
+    ----
+    ids: int, [int]
+        A single ID or a list of IDs.
+    """
+    id_array = np.asarray(ids, dtype=np.int64).ravel()
+    if len(id_array) <= ID_RANGE_THRESHOLD:
+        return " ".join(id_array.astype(str))
+
+    # Get the start and end values of all runs with consecutive IDs.
+    range_ends = np.flatnonzero(np.diff(id_array) != 1)
+    range_starts = id_array[np.concatenate(([0], range_ends + 1))].astype(str)
+    range_ends = id_array[np.concatenate((range_ends, [len(id_array) - 1]))].astype(str)
+    return " ".join(
+        [
+            start if start == end else f"{start} to {end}"
+            for start, end in zip(range_starts, range_ends)
+        ]
     )
@@ -27,10 +27,10 @@ With the package execnet in the host python interpreter a connection is
 established between the two different python interpreters and data and
 commands can be exchanged. The exchange happens in a serial matter,
 items are sent to this script, and results are sent back, until None is
-sent. If cubit creates a cubit object it is saved in a dictionary in
-this script, with the key being the id of the object. The host
-interpreter only knows the id of this object and can pass it to this
-script to call a function on it or use it as an argument.
+sent. If cubit creates a cubit object it is saved in a list in this
+script, with the id of the object being derived from the index in that
+list. The host interpreter only knows the id of this object and can pass it to
+this script to call a function on it or use it as an argument.
 """
 
 import os
@@ -66,24 +66,73 @@ def out(string):
 
 def is_cubit_type(obj):
     """Check if the object is of a cubit base."""
-    if (
-        isinstance(obj, cubit.Body)
-        or isinstance(obj, cubit.Vertex)
-        or isinstance(obj, cubit.Curve)
-        or isinstance(obj, cubit.Surface)
-        or isinstance(obj, cubit.Volume)
-        or isinstance(obj, cubit.MeshImport)
-    ):
+    obj_type = type(obj)
+    if obj_type in cubit_types:
+        return True
+    elif isinstance(obj, cubit_base_types):
+        # Derived classes are added to the set, so the next check for this
+        # type is a simple lookup.
+        cubit_types.add(obj_type)
         return True
     else:
         return False
 
 
-# All cubit items that are created are stored in this dictionary. The keys are
-# the unique object ids. The items are deleted once they run out of scope in
-# the host interpreter.
-cubit_objects = {}
+def store_object(cubit_object):
+    """Store a cubit object and return the list that represents it in the
+    host."""
+    if free_slots:
+        # Reuse a free slot. The generation of the slot is increased, so the
+        # ids of objects that were stored in this slot before are invalid.
+        slot = free_slots.pop()
+        object_id = slot_ids[slot] + SLOT_COUNT
+        slot_ids[slot] = object_id
+        cubit_objects[slot] = cubit_object
+    else:
+        object_id = len(cubit_objects)
+        slot_ids.append(object_id)
+        cubit_objects.append(cubit_object)
+    return object_to_id(cubit_object, object_id)
+
+
+def get_slot(object_id):
+    """Return the slot of a stored cubit object, or None if the object id is
+    not valid (anymore)."""
+    slot = object_id % SLOT_COUNT
+    if (
+        slot < len(cubit_objects)
+        and slot_ids[slot] == object_id
+        and cubit_objects[slot] is not None
+    ):
+        return slot
+    return None
+
+
+def get_object(object_id):
+    """Return the stored cubit object for an object id."""
+    slot = get_slot(object_id)
+    if slot is None:
+        raise ValueError("The id {} is not in the cubit_objects list".format(object_id))
+    return cubit_objects[slot]
+
+
+# All cubit items that are created are stored in this list. The items are
+# deleted once they run out of scope in the host interpreter, and the free
+# slots are reused for new objects. The object id is the index in the list
+# plus a multiple of SLOT_COUNT that is increased each time the slot is
+# reused. An id of a deleted object therefore never refers to a new object.
+SLOT_COUNT = 2**32
+cubit_objects = []
+slot_ids = []
+free_slots = []
 
+# Bound methods of the cubit objects that have already been called. The keys
+# are the object ids, the values are dictionaries with the method names as
+# keys. The entries are deleted together with the cubit objects.
+method_cache = {}
+
+# Result of get_self_dir for each class of cubit objects.
+self_dir_cache = {}
 
 # The first call are parameters needed in this script
 parameters = channel.receive()
@@ -101,7 +150,23 @@ sys.path.append(dir_name)
 sys.path.append(parameters["cubit_lib_path"])
 
 import cubit
-from cubit_wrapper_utility import cubit_item_to_id, is_base_type, object_to_id
+from cubit_wrapper_utility import (
+    OBJECT_LIST_TAG,
+    cubit_item_to_id,
+    is_base_type,
+    object_to_id,
+)
+
+# Cubit classes that can be returned to the host
+cubit_base_types = (
+    cubit.Body,
+    cubit.Vertex,
+    cubit.Curve,
+    cubit.Surface,
+    cubit.Volume,
+    cubit.MeshImport,
+)
+cubit_types = set(cubit_base_types)
 
 # The second call is the initialization call for cubit
 # init = ['init', cubit_path, [args]]
@@ -111,108 +176,173 @@ if not init[0] == "init":
 if not len(init) == 2:
     raise ValueError("Two arguments must be given to init!")
 cubit.init(init[1])
-cubit_objects[id(cubit)] = cubit
-channel.send(object_to_id(cubit))
+channel.send(store_object(cubit))
 
 
-# Now start an endless loop (until None is sent) and perform the cubit functions
-while 1:
-    # Get input from the python host.
-    receive = channel.receive()
+def deserialize_item(item):
+    """Deserialize the item, also if it contains nested nested lists."""
+    item_id = cubit_item_to_id(item)
+    if item_id is not None:
+        return get_object(item_id)
+    elif isinstance(item, (tuple, list)):
+        return [deserialize_item(sub_item) for sub_item in item]
+    else:
+        return item
 
-    # If None is sent, break the connection and exit
-    if receive is None:
-        break
 
-    # The first argument decides that functionality will be performed:
-    # 'cubit_object': return an attribute of a cubit object. If the attribute is
-    #       callable, it is executed with the given arguments.
-    #       [[cubit_object], 'name', ['arguments']]
-    # 'iscallable': Check if a name is callable or not
-    # 'isinstance': Check if the cubit object is of a certain instance
-    # 'get_self_dir': Return the attributes in a cubit_object
-    # 'delete': Delete the cubit object from the dictionary
+def convert_tuple_item(item):
+    """Convert an item of a returned tuple, such that it can be sent to the
+    host."""
+    if is_base_type(item):
+        return item
+    elif is_cubit_type(item):
+        return store_object(item)
+    else:
+        raise TypeError(
+            "Expected string, int, float or cubit object! Got {}!".format(item)
+        )
 
-    if cubit_item_to_id(receive[0]) is not None:
-        # The first item is an id for a cubit object. Return an attribute of
-        # this object.
 
-        # Get object and attribute name
-        call_object = cubit_objects[cubit_item_to_id(receive[0])]
-        name = receive[1]
-
-        def deserialize_item(item):
-            """Deserialize the item, also if it contains nested nested
-            lists."""
-            item_id = cubit_item_to_id(item)
-            if item_id is not None:
-                return cubit_objects[item_id]
-            elif isinstance(item, tuple) or isinstance(item, list):
-                arguments = []
-                for sub_item in item:
-                    arguments.append(deserialize_item(sub_item))
-                return arguments
-            else:
-                return item
-
-        if callable(getattr(call_object, name)):
-            # Call the function
-            arguments = deserialize_item(receive[2])
-            cubit_return = call_object.__getattribute__(name)(*arguments)
-        else:
-            # Get the attribute value
-            cubit_return = call_object.__getattribute__(name)
-
-        # Check what to return
-        if is_base_type(cubit_return):
-            # The return item is a string, integer or float
-            channel.send(cubit_return)
-
-        elif isinstance(cubit_return, tuple):
-            # A tuple was returned, loop over each entry and check its type
-            return_list = []
-            for item in cubit_return:
-                if is_base_type(item):
-                    return_list.append(item)
-                elif is_cubit_type(item):
-                    cubit_objects[id(item)] = item
-                    return_list.append(object_to_id(item))
-                else:
-                    raise TypeError(
-                        "Expected string, int, float or cubit object! Got {}!".format(
-                            item
-                        )
-                    )
-            channel.send(return_list)
-
-        elif is_cubit_type(cubit_return):
-            # Store the object locally and return the id
-            cubit_objects[id(cubit_return)] = cubit_return
-            channel.send(object_to_id(cubit_return))
+def call_cubit_object(object_id, receive):
+    """Return an attribute of a cubit object. If the attribute is callable, it
+    is executed with the given arguments.
 
+    The item to return is converted, such that it can be sent to the
+    host. The id of the object is already extracted from receive by the
+    caller.
+    """
+
+    # Get attribute name
+    name = receive[1]
+
+    # Get the bound method from the cache, or look up the attribute.
+    object_methods = method_cache.get(object_id)
+    if object_methods is not None and name in object_methods:
+        method = object_methods[name]
+    else:
+        attribute = getattr(get_object(object_id), name)
+        if callable(attribute):
+            method = attribute
+            method_cache.setdefault(object_id, {})[name] = method
         else:
-            raise TypeError(
-                "Expected string, int, float, cubit object or tuple! Got {}!".format(
-                    cubit_return
-                )
+            method = None
+
+    if method is not None:
+        # Call the function
+        arguments = deserialize_item(receive[2])
+        cubit_return = method(*arguments)
+    else:
+        # Get the attribute value
+        cubit_return = attribute
+
+    # Check what to return
+    if is_base_type(cubit_return):
+        # The return item is a string, integer or float
+        return cubit_return
+
+    elif isinstance(cubit_return, tuple):
+        # A tuple was returned, check the type of each entry. If it contains
+        # cubit objects (which are converted to lists) the list is tagged, so
+        # the host only has to look at the items in that case.
+        return_list = [convert_tuple_item(item) for item in cubit_return]
+        if any(type(item) is list for item in return_list):
+            return [OBJECT_LIST_TAG, return_list]
+        return return_list
+
+    elif is_cubit_type(cubit_return):
+        # Store the object locally and return the id
+        return store_object(cubit_return)
+
+    else:
+        raise TypeError(
+            "Expected string, int, float, cubit object or tuple! Got {}!".format(
+                cubit_return
             )
+        )
+
+
+def delete_object(cubit_item, ignore_invalid=False):
+    """Delete a cubit object from the list of objects.
+
+    If ignore_invalid is true, ids that are not valid (anymore) are
+    skipped, otherwise an error is raised.
+    """
+
+    # Get the id of the object to delete
+    cubit_id = cubit_item_to_id(cubit_item)
+    if cubit_id is None:
+        raise TypeError("Expected cubit object! Got {}!".format(cubit_item))
+
+    # Delete the object from the list and free its slot.
+    slot = get_slot(cubit_id)
+    if slot is not None:
+        cubit_objects[slot] = None
+        free_slots.append(slot)
+        method_cache.pop(cubit_id, None)
+    elif not ignore_invalid:
+        raise ValueError("The id {} is not in the cubit_objects list".format(cubit_id))
+
+
+def get_node_ids(cubit_object, geometry_type):
+    """Return a list with the node IDs of a geometry object.
+
+    This is done by creating a temporary node set that this geometry is
+    added to. It is not possible to get the node list directly from
+    cubit.
+    """
+
+    # Get a node set ID that is not yet taken
+    temp_node_set_id = max([0] + list(cubit.get_nodeset_id_list())) + 1
+
+    # Add a temporary node set with this geometry, get the nodes in it and
+    # delete the temporary node set again
+    cubit.cmd(
+        "nodeset {} {} {}".format(temp_node_set_id, geometry_type, cubit_object.id())
+    )
+    node_ids = cubit.get_nodeset_nodes_inclusive(temp_node_set_id)
+    cubit.cmd("delete nodeset {}".format(temp_node_set_id))
+    return list(node_ids)
+
+
+def process(receive):
+    """Perform the functionality requested by the host and return the item
+    that is sent back to the host.
+
+    The first argument decides that functionality will be performed:
+    'cubit_object': return an attribute of a cubit object. If the attribute is
+          callable, it is executed with the given arguments.
+          [[cubit_object], 'name', ['arguments']]
+    'iscallable': Check if a name is callable or not
+    'isinstance': Check if the cubit object is of a certain instance
+    'get_self_dir': Return the attributes in a cubit_object
+    'get_node_ids': Return the node IDs of a geometry object
+    'delete': Delete the cubit object from the list of objects
+    'delete_many': Delete a list of cubit objects from the list of objects
+    'batch': Process a list of requests and return a list with the results
+    """
+
+    object_id = cubit_item_to_id(receive[0])
+    if object_id is not None:
+        # The first item is an id for a cubit object. Return an attribute of
+        # this object.
+        return call_cubit_object(object_id, receive)
 
     elif receive[0] == "iscallable":
-        cubit_object = cubit_objects[cubit_item_to_id(receive[1])]
-        channel.send(callable(getattr(cubit_object, receive[2])))
+        cubit_object = get_object(cubit_item_to_id(receive[1]))
+        return callable(getattr(cubit_object, receive[2]))
 
     elif receive[0] == "isinstance":
         # Compare the second item with a predefined cubit class
-        compare_object = cubit_objects[cubit_item_to_id(receive[1])]
+        compare_object = get_object(cubit_item_to_id(receive[1]))
 
         if receive[2] == cubit_vertex:
-            channel.send(isinstance(compare_object, cubit.Vertex))
+            return isinstance(compare_object, cubit.Vertex)
         elif receive[2] == cubit_curve:
-            channel.send(isinstance(compare_object, cubit.Curve))
+            return isinstance(compare_object, cubit.Curve)
         elif receive[2] == cubit_surface:
-            channel.send(isinstance(compare_object, cubit.Surface))
+            return isinstance(compare_object, cubit.Surface)
         elif receive[2] == cubit_volume:
-            channel.send(isinstance(compare_object, cubit.Volume))
+            return isinstance(compare_object, cubit.Volume)
         else:
             raise ValueError(
                 "Wrong compare type given! Expected vertex, curve, surface or volume, got{}".format(
@@ -221,35 +351,59 @@ while 1:
             )
 
     elif receive[0] == "get_self_dir":
-        # Return a list with all callable methods of this object
-        cubit_object = cubit_objects[cubit_item_to_id(receive[1])]
-        channel.send(
-            [
+        # Return a list with all attributes and if they are callable for this
+        # object. All objects of the same class have the same attributes, so
+        # this is only evaluated once per class.
+        cubit_object = get_object(cubit_item_to_id(receive[1]))
+        object_type = type(cubit_object)
+        self_dir = self_dir_cache.get(object_type)
+        if self_dir is None:
+            self_dir = [
                 [method_name, callable(getattr(cubit_object, method_name))]
                 for method_name in dir(cubit_object)
             ]
-        )
+            self_dir_cache[object_type] = self_dir
+        return self_dir
+
+    elif receive[0] == "get_node_ids":
+        cubit_object = get_object(cubit_item_to_id(receive[1]))
+        return get_node_ids(cubit_object, receive[2])
 
     elif receive[0] == "delete":
-        # Get the id of the object to delete
-        cubit_id = cubit_item_to_id(receive[1])
-        if cubit_id is None:
-            raise TypeError("Expected cubit object! Got {}!".format(item))
-
-        # Delete the object from the dictionary.
-        if cubit_id in cubit_objects.keys():
-            del cubit_objects[cubit_id]
-        else:
-            raise ValueError(
-                "The id {} is not in the cubit_objects dictionary".format(cubit_id)
-            )
+        delete_object(receive[1])
 
         # Return to python host
-        channel.send(None)
+        return None
+
+    elif receive[0] == "delete_many":
+        # These deletes are sent by the host together with an unrelated call,
+        # so ids that are already invalid (e.g., an object that was deleted
+        # via a copy of its host object) are skipped instead of failing that
+        # call. Because of the slot generations this can never delete a
+        # different object.
+        for cubit_item in receive[1]:
+            delete_object(cubit_item, ignore_invalid=True)
+        return None
+
+    elif receive[0] == "batch":
+        # Process all requests and return all results at once
+        return [process(item) for item in receive[1]]
 
     else:
         raise ValueError('The case of "{}" is not implemented!'.format(receive[0]))
 
 
+# Now start an endless loop (until None is sent) and perform the cubit functions
+while 1:
+    # Get input from the python host.
+    receive = channel.receive()
+
+    # If None is sent, break the connection and exit
+    if receive is None:
+        break
+
+    channel.send(process(receive))
+
+
 # Send EOF
 channel.send("EOF")
@@ -23,13 +23,78 @@
 interpreter and the main python interpreter."""
 
 import atexit
+import functools
 import os
+import sys
 
 import execnet
 import numpy as np
 
 from cubitpy.conf import cupy
-from cubitpy.cubit_wrapper.cubit_wrapper_utility import cubit_item_to_id, is_base_type
+from cubitpy.cubit_wrapper.cubit_wrapper_utility import (
+    BASE_TYPES,
+    BASE_TYPES_TUPLE,
+    OBJECT_LIST_TAG,
+    cubit_item_to_id,
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_client_source(path):
+    """Return the source code of the client script.
+
+    The file is only read once per session, the result is reused for
+    all further connections.
+    """
+    with open(path, "r") as myfile:
+        return myfile.read()
+
+
+# Types that are sent to the client without conversion.
+_PLAIN_TYPES = frozenset([str, int, float, type(None)])
+
+# Names of the geometry types in the client and the corresponding geometry
+# types in cubitpy, in the order they are checked.
+_GEOMETRY_TYPES = (
+    ("cubitpy_vertex", cupy.geometry.vertex),
+    ("cubitpy_curve", cupy.geometry.curve),
+    ("cubitpy_surface", cupy.geometry.surface),
+    ("cubitpy_volume", cupy.geometry.volume),
+)
+
+
+def serialize_item(item):
+    """Serialize an item that is sent to the client, also nested lists."""
+
+    item_type = type(item)
+    if item_type in _PLAIN_TYPES:
+        # Most arguments are plain python types that can be sent directly.
+        return item
+    elif (item_type is tuple or item_type is list) and all(
+        type(sub_item) in _PLAIN_TYPES for sub_item in item
+    ):
+        # Flat argument lists, e.g., obj.method(1, 2, 3.0), don't need to be
+        # serialized item by item.
+        return list(item)
+    elif isinstance(item, np.ndarray) and item.dtype.kind in "biuf":
+        # Numeric arrays are directly converted to (nested) lists of python
+        # numbers, which is much faster than looping over the entries.
+        return item.tolist()
+    elif isinstance(item, (tuple, list, np.ndarray)):
+        return [serialize_item(sub_item) for sub_item in item]
+    elif isinstance(item, CubitObject):
+        return item.cubit_id
+    elif isinstance(item, float):
+        return float(item)
+    elif isinstance(item, int):
+        return int(item)
+    elif isinstance(item, np.generic):
+        # Numpy scalars, e.g., numpy integers, can not be sent to the client.
+        return item.item()
+    elif isinstance(item, cupy.geometry):
+        return item.get_cubit_string()
+    else:
+        return item
 
 
 class CubitConnect(object):
@@ -70,6 +135,27 @@ class CubitConnect(object):
         if cubit_lib is None:
             cubit_lib = cupy.get_cubit_lib_path()
 
+        # Cache if an attribute of a class in the client is callable.
+        self._callable_cache = {}
+
+        # Cache the attributes of each class in the client.
+        self._self_dir_cache = {}
+
+        # Cache the results of isinstance checks for each class in the client.
+        self._isinstance_cache = {}
+
+        # Cache the geometry type for each class in the client.
+        self._geometry_type_cache = {}
+
+        # Objects that have to be deleted in the client.
+        self._delete_queue = []
+
+        # Number of objects in this interpreter that use this connection, i.e.,
+        # CubitPy and CubitObject objects. Once the last one is deleted, the
+        # release callback is called, see hold and release.
+        self._n_holders = 0
+        self.release_callback = None
+
         # Set up the client python interpreter
         self.gw = execnet.makegateway(interpreter)
         self.gw.reconfigure(py3str_as_py2str=True)
@@ -78,8 +164,7 @@ class CubitConnect(object):
         client_python_file = os.path.join(
             os.path.dirname(__file__), "cubit_wrapper_client.py"
         )
-        with open(client_python_file, "r") as myfile:
-            data = myfile.read()
+        data = _load_client_source(client_python_file)
 
         # Set up the connection channel
         self.channel = self.gw.remote_exec(data)
@@ -112,6 +197,8 @@ class CubitConnect(object):
             log_given = False
 
         self.log_check = False
+        self._log_fd = None
+        self._log_is_clear = False
 
         if not log_given:
             # Write the log to a temporary file and check the contents after each call to cubit
@@ -126,14 +213,40 @@ class CubitConnect(object):
         cubit_id = self.send_and_return(["init", arguments])
         self.cubit = CubitObjectMain(self, cubit_id)
 
+        # The main object belongs to this connection, it does not hold it.
+        self._n_holders = 0
+
+        # Keep the log file open for the whole session, so we don't have to
+        # open it again for each call to cubit.
+        if self.log_check:
+            self._log_fd = os.open(cupy.temp_log, os.O_RDWR | os.O_CREAT, 0o644)
+
         def cleanup_execnet_gateway():
             """We need to register a function called at interpreter shutdown
             that ensures that the execnet connection is closed first,
             otherwise, we get a runtime error during shutdown."""
             self.cubit.cubit_connect.gw.exit()
+            if self._log_fd is not None:
+                os.close(self._log_fd)
 
         atexit.register(cleanup_execnet_gateway)
 
+    def hold(self):
+        """Register an object that uses this connection."""
+        self._n_holders += 1
+
+    def release(self):
+        """Deregister an object that used this connection.
+
+        If no object uses this connection anymore, the release callback
+        is called with this connection.
+        """
+        self._n_holders -= 1
+        if self._n_holders == 0 and self.release_callback is not None:
+            release_callback = self.release_callback
+            self.release_callback = None
+            release_callback(self)
+
     def send_and_return(self, argument_list):
         """Send arguments to the python client and collect the return values.
 
@@ -145,14 +258,150 @@ class CubitConnect(object):
             arguments stored in the second entry in argument_list.
         """
 
+        # Objects that were deleted in this interpreter are deleted in the
+        # client together with this call.
+        if self._delete_queue:
+            delete_items = self._delete_queue
+            self._delete_queue = []
+            return_values = self._send_and_receive(
+                ["batch", [["delete_many", delete_items], argument_list]]
+            )
+            if return_values is None:
+                return None
+            return return_values[1]
+
+        return self._send_and_receive(argument_list)
+
+    def _send_and_receive(self, argument_list):
+        """Send a single item to the python client and return the answer."""
+
         # If the channel is already finalized we get a runtime error here. This happens in cases
         # where we delete items after the connection has been closed. We catch this error here.
         try:
             self.channel.send(argument_list)
+            # Cubit might write to the log with each call, also if the call
+            # fails before the log is printed.
+            self._log_is_clear = False
             return self.channel.receive()
         except:
             return None
 
+    def send_batch(self, argument_lists):
+        """Send multiple argument lists to the python client at once and
+        collect all return values with a single round trip.
+
+        Args
+        ----
+        argument_lists: [list]
+            List of argument lists, each one as described in
+            `send_and_return`.
+        """
+        return self.send_and_return(["batch", argument_lists])
+
+    def _clear_log(self):
+        """Empty the log file of cubit, if the log is checked."""
+        if self.log_check and not self._log_is_clear:
+            # Check if the log file is empty. If it is not, empty it.
+            if os.fstat(self._log_fd).st_size != 0:
+                os.ftruncate(self._log_fd, 0)
+            self._log_is_clear = True
+
+    def _print_log(self):
+        """Print the contents of the log file of cubit, if the log is
+        checked.
+
+        The log file is emptied afterwards, so the next call to
+        _clear_log does not have to check the file again.
+        """
+        if self.log_check:
+            # Print the content of the log file
+            log_size = os.fstat(self._log_fd).st_size
+            if log_size != 0:
+                os.lseek(self._log_fd, 0, os.SEEK_SET)
+                log = os.read(self._log_fd, log_size)
+                sys.stdout.write(log.decode(errors="replace"))
+                os.ftruncate(self._log_fd, 0)
+            self._log_is_clear = True
+
+    def _convert_return(self, cubit_return):
+        """Convert a value returned from the client, i.e., create cubit objects
+        for all items that represent an object in the client."""
+
+        # Base types are the most common return values, so they are checked
+        # on the exact type first.
+        return_type = type(cubit_return)
+        if return_type in BASE_TYPES:
+            return cubit_return
+        elif return_type is list:
+            # Check if the return value is a cubit object
+            if cubit_item_to_id(cubit_return) is not None:
+                return CubitObject(self, cubit_return)
+
+            # The client tags lists that contain cubit objects. All other
+            # lists only contain base types and can be returned directly.
+            if len(cubit_return) == 2 and cubit_return[0] == OBJECT_LIST_TAG:
+                return [
+                    CubitObject(self, item) if type(item) is list else item
+                    for item in cubit_return[1]
+                ]
+            return cubit_return
+        elif isinstance(cubit_return, BASE_TYPES_TUPLE):
+            # Types derived from the base types.
+            return cubit_return
+        else:
+            raise TypeError(
+                "Expected cubit object, or base_type, " + "got {}!".format(cubit_return)
+            )
+
+    def call_batch(self, calls):
+        """Call multiple methods on cubit objects with a single round trip to
+        the client.
+
+        This can be used for a sequence of calls that do not depend on
+        each others results.
+
+        Args
+        ----
+        calls: [[CubitObject, str, list]]
+            List of calls, each one given by the object on which the method
+            is called, the name of the method and the arguments.
+
+        Return
+        ----
+        A list with the return values of the calls.
+        """
+
+        self._clear_log()
+        cubit_returns = self.send_batch(
+            [
+                [cubit_object.cubit_id, name, serialize_item(args)]
+                for cubit_object, name, args in calls
+            ]
+        )
+        self._print_log()
+        return [self._convert_return(cubit_return) for cubit_return in cubit_returns]
+
+    def get_self_dir(self, cubit_object):
+        """Return a list of all cubit child items of cubit_object, together
+        with a flag if the child item is callable or not.
+
+        The attributes only depend on the class of the object in the
+        client, so they are only requested once for each class.
+
+        Args
+        ----
+        cubit_object: CubitObject
+            The object whose attributes are returned.
+        """
+        class_name = cubit_object.cubit_id[2]
+        self_dir = self._self_dir_cache.get(class_name)
+        if self_dir is None:
+            self_dir = self.send_and_return(["get_self_dir", cubit_object.cubit_id])
+            self._self_dir_cache[class_name] = self_dir
+            for attribute_name, is_callable in self_dir:
+                self._callable_cache[(class_name, attribute_name)] = is_callable
+        return self_dir
+
     def get_attribute(self, cubit_object, name):
         """Return the attribute 'name' of cubit_object. If the attribute is
         callable a function is returned, otherwise the attribute value is
@@ -169,34 +418,7 @@ class CubitConnect(object):
         def function(*args):
             """This function gets returned from the parent method."""
 
-            def serialize_item(item):
-                """Serialize an item, also nested lists."""
-
-                if (
-                    isinstance(item, tuple)
-                    or isinstance(item, list)
-                    or isinstance(item, np.ndarray)
-                ):
-                    arguments = []
-                    for sub_item in item:
-                        arguments.append(serialize_item(sub_item))
-                    return arguments
-                elif isinstance(item, CubitObject):
-                    return item.cubit_id
-                elif isinstance(item, float):
-                    return float(item)
-                elif isinstance(item, int):
-                    return int(item)
-                elif isinstance(item, cupy.geometry):
-                    return item.get_cubit_string()
-                else:
-                    return item
-
-            if self.log_check:
-                # Check if the log file is empty. If it is not, empty it.
-                if os.stat(cupy.temp_log).st_size != 0:
-                    with open(cupy.temp_log, "w"):
-                        pass
+            self._clear_log()
 
             # Check if there are cubit objects in the arguments
             arguments = serialize_item(args)
@@ -206,40 +428,21 @@ class CubitConnect(object):
                 [cubit_object.cubit_id, name, arguments]
             )
 
-            if self.log_check:
-                # Print the content of the log file
-                with open(cupy.temp_log, "r") as log_file:
-                    print(log_file.read(), end="")
-
-            # Check if the return value is a cubit object
-            if cubit_item_to_id(cubit_return) is not None:
-                return CubitObject(self, cubit_return)
-            elif isinstance(cubit_return, list):
-                # If the return value is a list, check if any entry of the list
-                # is a cubit object
-                return_list = []
-                for item in cubit_return:
-                    if cubit_item_to_id(item) is not None:
-                        return_list.append(CubitObject(self, item))
-                    elif is_base_type(item):
-                        return_list.append(item)
-                    else:
-                        raise TypeError(
-                            "Expected cubit object, or base_type, "
-                            + "got {}!".format(item)
-                        )
-                return return_list
-            elif is_base_type(cubit_return):
-                return cubit_return
-            else:
-                raise TypeError(
-                    "Expected cubit object, or base_type, "
-                    + "got {}!".format(cubit_return)
-                )
+            self._print_log()
+            return self._convert_return(cubit_return)
 
         # Depending on the type of attribute, return the attribute value or a
-        # callable function
-        if self.send_and_return(["iscallable", cubit_object.cubit_id, name]):
+        # callable function. Whether an attribute is callable only depends on
+        # the class of the object in the client, so this is only checked once
+        # for each class and attribute name.
+        callable_key = (cubit_object.cubit_id[2], name)
+        is_callable = self._callable_cache.get(callable_key)
+        if is_callable is None:
+            is_callable = self.send_and_return(
+                ["iscallable", cubit_object.cubit_id, name]
+            )
+            self._callable_cache[callable_key] = is_callable
+        if is_callable:
             return function
         else:
             return function()
@@ -252,6 +455,11 @@ class CubitObject(object):
     client.
     """
 
+    # Objects of this class are created for every cubit object returned by
+    # the client, so the attributes are stored in slots. The main object
+    # (CubitObjectMain) has an instance dictionary to store its methods.
+    __slots__ = ("cubit_connect", "cubit_id")
+
     def __init__(self, cubit_connect, cubit_data_list):
         """Initialize the object.
 
@@ -271,26 +479,52 @@ class CubitObject(object):
 
         self.cubit_connect = cubit_connect
         self.cubit_id = cubit_data_list
+        cubit_connect.hold()
 
-    def __getattribute__(self, name, *args, **kwargs):
-        """This function gets called for each attribute in this object. First
-        it is checked if the attribute exists in the host (basic stuff), if not
-        the attribute is called on the client.
+    def __getattr__(self, name):
+        """This function gets called for attributes that do not exist in this
+        object (basic stuff is found by the default lookup). These attributes
+        are called on the client.
 
         For now if an attribute is sent to the client, it is assumed
         that it is a method.
         """
 
-        # Check if the attribute exists in this interpreter
-        try:
-            return object.__getattribute__(self, name, *args, **kwargs)
-        except AttributeError:
-            return self.cubit_connect.get_attribute(self, name)
+        # The attributes of this object itself are never sent to the client,
+        # e.g., if they are accessed before __init__ set them. The same holds
+        # for private and special names, which are looked up by python itself
+        # (e.g., copy or numpy check for __deepcopy__ or __array__).
+        if name.startswith("_") or name in ("cubit_connect", "cubit_id"):
+            raise AttributeError(name)
+        return self.cubit_connect.get_attribute(self, name)
 
     def __del__(self):
         """When this object is deleted, the object in the client can also be
-        deleted."""
-        self.cubit_connect.send_and_return(["delete", self.cubit_id])
+        deleted.
+
+        This is not done directly, the object is deleted in the client
+        together with the next call to the client.
+        """
+        self.cubit_connect._delete_queue.append(self.cubit_id)
+        self.cubit_connect.release()
+
+    def __copy__(self):
+        """A copy would hold the same client object and delete it when the
+        copy is deleted, so the object itself is returned."""
+        return self
+
+    def __deepcopy__(self, memo):
+        """The client object can not be copied, so the object itself is
+        returned, see __copy__."""
+        return self
+
+    def __dir__(self):
+        """Return the attributes of this object and of the object in the
+        client, e.g., for tab completion."""
+        return sorted(
+            set(object.__dir__(self))
+            | set(name for name, _ in self.cubit_connect.get_self_dir(self))
+        )
 
     def __str__(self):
         """Return the string from the client."""
@@ -305,17 +539,24 @@ class CubitObject(object):
             Name of the geometry to compare (vertex, curve, surface, volume).
         """
 
-        # Compare in client python interpreter.
-        return self.cubit_connect.send_and_return(
-            ["isinstance", self.cubit_id, geom_type]
-        )
+        # Compare in client python interpreter. The result only depends on the
+        # class of the object, so it is only checked once for each class.
+        isinstance_cache = self.cubit_connect._isinstance_cache
+        isinstance_key = (self.cubit_id[2], geom_type)
+        is_instance = isinstance_cache.get(isinstance_key)
+        if is_instance is None:
+            is_instance = self.cubit_connect.send_and_return(
+                ["isinstance", self.cubit_id, geom_type]
+            )
+            isinstance_cache[isinstance_key] = is_instance
+        return is_instance
 
     def get_self_dir(self):
         """Return a list of all cubit child items of this object.
 
         Also return a flag if the child item is callable or not.
         """
-        return self.cubit_connect.send_and_return(["get_self_dir", self.cubit_id])
+        return self.cubit_connect.get_self_dir(self)
 
     def get_methods(self):
         """Return a list of all callable cubit methods for this object."""
@@ -326,19 +567,43 @@ class CubitObject(object):
         return [method for method, callable in self.get_self_dir() if not callable]
 
     def get_geometry_type(self):
-        """Return the type of this item."""
+        """Return the type of this item.
+
+        The geometry type only depends on the class of the object in the
+        client, so it is only evaluated once for each class.
+        """
 
-        if self.isinstance("cubitpy_vertex"):
-            return cupy.geometry.vertex
-        elif self.isinstance("cubitpy_curve"):
-            return cupy.geometry.curve
-        elif self.isinstance("cubitpy_surface"):
-            return cupy.geometry.surface
-        elif self.isinstance("cubitpy_volume"):
-            return cupy.geometry.volume
+        geometry_type_cache = self.cubit_connect._geometry_type_cache
+        geometry_type = geometry_type_cache.get(self.cubit_id[2])
+        if geometry_type is None:
+            geometry_type = self._evaluate_geometry_type()
+            geometry_type_cache[self.cubit_id[2]] = geometry_type
+        return geometry_type
 
-        # Default value -> not a valid geometry
-        raise TypeError("The item is not a valid geometry!")
+    def _evaluate_geometry_type(self):
+        """Check the type of this item in the client.
+
+        All isinstance checks are sent to the client with a single round
+        trip, the results are also stored in the isinstance cache.
+        """
+
+        isinstance_cache = self.cubit_connect._isinstance_cache
+        results = self.cubit_connect.send_batch(
+            [
+                ["isinstance", self.cubit_id, geom_type]
+                for geom_type, _geometry_type in _GEOMETRY_TYPES
+            ]
+        )
+        evaluated_type = None
+        for (geom_type, geometry_type), is_instance in zip(_GEOMETRY_TYPES, results):
+            isinstance_cache[(self.cubit_id[2], geom_type)] = is_instance
+            if is_instance and evaluated_type is None:
+                evaluated_type = geometry_type
+
+        if evaluated_type is None:
+            # Default value -> not a valid geometry
+            raise TypeError("The item is not a valid geometry!")
+        return evaluated_type
 
     def get_node_ids(self):
         """Return a list with the node IDs (index 1) of this object.
@@ -348,31 +613,36 @@ class CubitObject(object):
         from cubit.
         """
 
-        # Get a node set ID that is not yet taken
-        node_set_ids = [0]
-        node_set_ids.extend(self.cubit_connect.cubit.get_nodeset_id_list())
-        temp_node_set_id = max(node_set_ids) + 1
-
-        # Add a temporary node set with this geometry
-        self.cubit_connect.cubit.cmd(
-            "nodeset {} {} {}".format(
-                temp_node_set_id, self.get_geometry_type().get_cubit_string(), self.id()
-            )
-        )
-
-        # Get the nodes in the created node set
-        node_ids = self.cubit_connect.cubit.get_nodeset_nodes_inclusive(
-            temp_node_set_id
+        # The whole sequence is performed in the client with a single round
+        # trip.
+        self.cubit_connect._clear_log()
+        node_ids = self.cubit_connect.send_and_return(
+            [
+                "get_node_ids",
+                self.cubit_id,
+                self.get_geometry_type().get_cubit_string(),
+            ]
         )
-
-        # Delete the temp node set and return the node list
-        self.cubit_connect.cubit.cmd("delete nodeset {}".format(temp_node_set_id))
+        self.cubit_connect._print_log()
         return node_ids
 
 
 class CubitObjectMain(CubitObject):
     """The main cubit object will be of this type, it can not delete itself."""
 
+    def __getattr__(self, name):
+        """Get the attribute from the client.
+
+        The main object exists for the whole session, so its methods are
+        stored in this object. Further calls to these methods, e.g.,
+        cubit.cmd, are found by the default lookup and don't create a
+        new function.
+        """
+        attribute = super().__getattr__(name)
+        if callable(attribute):
+            self.__dict__[name] = attribute
+        return attribute
+
     def __del__(self):
         """Overwrite the default, because we don't want to delete any objects
         on the client if this main object is deleted."""
@@ -21,27 +21,44 @@
 # THE SOFTWARE.
 """Utility functions for the cubit wrapper."""
 
+import sys
 
-def object_to_id(obj):
+# Types that can be sent between the python interpreters without conversion.
+# The exact type is checked first, so bool has to be added explicitly. Derived
+# types are checked with BASE_TYPES_TUPLE.
+BASE_TYPES = frozenset([str, int, float, bool, type(None)])
+if sys.version_info[0] < 3:
+    BASE_TYPES = BASE_TYPES | frozenset([unicode])  # noqa: F821
+BASE_TYPES_TUPLE = tuple(BASE_TYPES)
+
+
+# Prefix of the string that identifies a cubit object in the client.
+ID_PREFIX = "cubitpy_id_"
+ID_PREFIX_LENGTH = len(ID_PREFIX)
+
+# First item of a list returned by the client that contains cubit objects.
+# Lists without this tag only contain base types.
+OBJECT_LIST_TAG = "cubitpy_object_list"
+
+
+def object_to_id(obj, object_id):
     """Return list representing the cubit object.
 
-    The first entry is the python id of the object, the second entry is
-    the string representation.
+    The first entry is the id of the object in the client, the second
+    entry is the string representation and the third entry is the name
+    of the class of the object.
     """
-    return ["cubitpy_id_" + str(id(obj)), str(obj)]
+    return [ID_PREFIX + str(object_id), str(obj), obj.__class__.__name__]
 
 
 def cubit_item_to_id(cubit_data_list):
     """Return the id from a cubit data list."""
-    if not isinstance(cubit_data_list, list):
-        return None
-    if len(cubit_data_list) == 0:
+    # All items come from the channel, so we can check for the exact types.
+    if type(cubit_data_list) is not list or not cubit_data_list:
         return None
-    if not isinstance(cubit_data_list[0], str):
-        return None
-    start_string = "cubitpy_id_"
-    if cubit_data_list[0].startswith(start_string):
-        return int(cubit_data_list[0][len(start_string) :])
+    first_item = cubit_data_list[0]
+    if type(first_item) is str and first_item[:ID_PREFIX_LENGTH] == ID_PREFIX:
+        return int(first_item[ID_PREFIX_LENGTH:])
     else:
         return None
 
@@ -49,12 +66,4 @@ def cubit_item_to_id(cubit_data_list):
 def is_base_type(obj):
     """Check if the object is of a base type that does not need conversion for
     the connection between the different python interpreters."""
-    if (
-        isinstance(obj, str)
-        or isinstance(obj, int)
-        or isinstance(obj, float)
-        or isinstance(obj, type(None))
-    ):
-        return True
-    else:
-        return False
+    return type(obj) in BASE_TYPES or isinstance(obj, BASE_TYPES_TUPLE)
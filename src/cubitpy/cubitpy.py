@@ -21,12 +21,12 @@
 # THE SOFTWARE.
 """Implements a class that helps create meshes with cubit."""
 
+import functools
 import os
-import subprocess  # nosec B404
 import time
 import warnings
+import weakref
 
-import netCDF4
 from fourcipp.fourc_input import FourCInput
 
 from cubitpy.conf import GeometryType, cupy
@@ -38,6 +38,61 @@ from cubitpy.cubit_to_fourc_input import (
 )
 from cubitpy.cubit_wrapper.cubit_wrapper_host import CubitConnect
 
+# Items that can be labeled in cubit.
+CUBIT_LABELS = (
+    "volume",
+    "surface",
+    "curve",
+    "vertex",
+    "hex",
+    "tet",
+    "face",
+    "tri",
+    "edge",
+    "node",
+)
+
+# Connections to cubit that are not used by any object anymore. The keys
+# are the arguments the connections were created with.
+_free_connections = {}
+
+
+def _get_connection_key(kwargs):
+    """Return a hashable key for the arguments of a CubitConnect."""
+    return tuple(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in sorted(kwargs.items())
+    )
+
+
+def _release_connection(key, cubit_connect):
+    """Put a connection back, so it can be used by the next CubitPy object."""
+    _free_connections.setdefault(key, []).append(cubit_connect)
+
+
+def _hold_connection(cubitpy):
+    """Register a CubitPy object as holder of its connection to cubit, until
+    the object is deleted."""
+    cubit_connect = cubitpy.cubit.cubit_connect
+    cubit_connect.hold()
+    weakref.finalize(cubitpy, cubit_connect.release)
+
+
+def _wait_for_file(path, timeout, interval=0.01):
+    """Wait until the file at path exists and its size did not change between
+    two successive checks, but at most timeout seconds."""
+    end_time = time.monotonic() + timeout
+    last_size = None
+    while time.monotonic() < end_time:
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            size = None
+        if size is not None and size > 0 and size == last_size:
+            return
+        last_size = size
+        time.sleep(interval)
+
 
 def _get_and_check_ids(name, container, id_list, given_id):
     """Perform checks for the block and node set IDs used in CubitPy."""
@@ -62,13 +117,32 @@ def _get_and_check_ids(name, container, id_list, given_id):
 class CubitPy(object):
     """A wrapper class with additional functionality for cubit."""
 
-    def __init__(self, *, cubit_exe=None, **kwargs):
+    # All attributes of this object are stored in slots, so looking them up
+    # does not require a dictionary access. The weak reference is needed to
+    # release the connection to cubit once this object is deleted.
+    __slots__ = (
+        "cubit_exe",
+        "cubit",
+        "blocks",
+        "node_sets",
+        "fourc_input",
+        "__weakref__",
+    )
+
+    def __init__(self, *, cubit_exe=None, reuse_connection=False, **kwargs):
         """Initialize CubitPy.
 
         Args
         ----
         cubit_exe: str
             Path to the cubit executable
+        reuse_connection: bool
+            If this is true, the connection to cubit of a deleted CubitPy
+            object (that was also created with this flag and the same
+            arguments) is reused, instead of starting a new cubit session.
+            A connection is only reused once the CubitPy object, its copies
+            and all cubit objects from that connection are deleted. Cubit is
+            reset in this case, but session wide settings are kept.
 
         kwargs:
             Arguments passed on to the creation of the python wrapper
@@ -79,8 +153,24 @@ class CubitPy(object):
             cubit_exe = cupy.get_cubit_exe_path()
         self.cubit_exe = cubit_exe
 
-        # Set the "real" cubit object
-        self.cubit = CubitConnect(**kwargs).cubit
+        # Set the "real" cubit object. Starting cubit is expensive, so if
+        # requested, a connection from a previous CubitPy object is reused. The
+        # connection is given back once no object uses it anymore, and cubit
+        # is reset below.
+        if reuse_connection:
+            connection_key = _get_connection_key(kwargs)
+            free_connections = _free_connections.get(connection_key)
+            if free_connections:
+                cubit_connect = free_connections.pop()
+            else:
+                cubit_connect = CubitConnect(**kwargs)
+            cubit_connect.release_callback = functools.partial(
+                _release_connection, connection_key
+            )
+        else:
+            cubit_connect = CubitConnect(**kwargs)
+        self.cubit = cubit_connect.cubit
+        _hold_connection(self)
 
         # Reset cubit
         self.cubit.cmd("reset")
@@ -95,12 +185,78 @@ class CubitPy(object):
         self.node_sets = {}
         self.fourc_input = FourCInput()
 
-    def __getattr__(self, key, *args, **kwargs):
+    def __setstate__(self, state):
+        """Set the attributes of a copy of a CubitPy object.
+
+        The copy uses the same connection to cubit, so it also holds the
+        connection.
+        """
+        _dict_state, slot_state = state
+        for key, value in slot_state.items():
+            setattr(self, key, value)
+        _hold_connection(self)
+
+    def __getattr__(self, key):
         """All calls to methods and attributes that are not in this object get
         passed to cubit."""
-        return self.cubit.__getattribute__(key, *args, **kwargs)
 
-    def _name_created_set(self, set_type, set_id, name, item):
+        # Private and special names are not passed to cubit, they are looked
+        # up by python itself (e.g., copy checks for __deepcopy__). The same
+        # holds for the cubit object, if it is accessed before it is set.
+        if key.startswith("_") or key == "cubit":
+            raise AttributeError(key)
+        return getattr(self.cubit, key)
+
+    def call_batch(self, calls):
+        """Call multiple cubit methods with a single round trip to the cubit
+        interpreter.
+
+        Args
+        ----
+        calls: [[CubitObject, str, list]]
+            List of calls, each one given by the object on which the method
+            is called, the name of the method and the arguments. The calls
+            are executed in the given order.
+
+        Return
+        ----
+        A list with the return values of the calls.
+        """
+        if not calls:
+            return []
+        return self.cubit.cubit_connect.call_batch(calls)
+
+    def _cmd_batch(self, commands):
+        """Execute multiple cubit commands with a single round trip to the
+        cubit interpreter.
+
+        Args
+        ----
+        commands: [str]
+            List of cubit commands, executed in the given order.
+        """
+        self.call_batch([[self.cubit, "cmd", [command]] for command in commands])
+
+    def _get_id_list_and_item_id(self, id_list_function, item):
+        """Get the existing set ids in cubit and the id of the item that
+        will be added to the new set.
+
+        For cubit objects both values are queried with a single round trip
+        to the cubit interpreter.
+
+        Args
+        ----
+        id_list_function: str
+            Name of the cubit function that returns the existing set ids.
+        item: CubitObject, CubitGroup
+            Item that will be added to the set. For groups no item id is
+            returned.
+        """
+        if isinstance(item, CubitGroup):
+            return getattr(self.cubit, id_list_function)(), None
+        return self.call_batch([[self.cubit, id_list_function, []], [item, "id", []]])
+
+    def _name_created_set(self, set_type, set_id, name, item, create_commands=()):
         """Create a node set or block and name it. This is an own method
         because it can be used for both types of set in cubit. If the added
         item is a group, no explicit name should be given and the group name
@@ -118,6 +274,9 @@ class CubitPy(object):
             An explicitly given name.
         item: CubitObject, CubitGroup
             The item that was added to the set.
+        create_commands: [str]
+            Commands that create the set. They are sent to cubit together with
+            the command that renames the set.
         """
 
         # Check if the item is a group and if it has a name.
@@ -141,9 +300,12 @@ class CubitPy(object):
         elif name is not None:
             rename_name = name
 
-        # Rename the item.
+        # Create and rename the item with a single call to cubit.
+        commands = list(create_commands)
         if rename_name is not None:
-            self.cubit.cmd('{} {} name "{}"'.format(set_type, set_id, rename_name))
+            commands.append(f'{set_type} {set_id} name "{rename_name}"')
+        if commands:
+            self._cmd_batch(commands)
 
     def add_element_type(
         self,
@@ -184,37 +346,33 @@ class CubitPy(object):
             bc_description = {}
 
         # Check and get the block id for the new block.
-        block_id = _get_and_check_ids(
-            "block", self.blocks, self.cubit.get_block_id_list(), block_id
+        block_id_list, item_id = self._get_id_list_and_item_id(
+            "get_block_id_list", item
         )
+        block_id = _get_and_check_ids("block", self.blocks, block_id_list, block_id)
 
         # Get element type of item.
         geometry_type = item.get_geometry_type()
 
-        self.cubit.cmd("create block {}".format(block_id))
-
         if not isinstance(item, CubitGroup):
             cubit_scheme, cubit_element_type = el_type.get_cubit_names()
-
-            # Set the meshing scheme for this element type.
-            self.cubit.cmd(
-                "{} {} scheme {}".format(
-                    geometry_type.get_cubit_string(), item.id(), cubit_scheme
-                )
-            )
-
-            self.cubit.cmd(
-                "block {} {} {}".format(
-                    block_id, geometry_type.get_cubit_string(), item.id()
-                )
-            )
-            self.cubit.cmd(
-                "block {} element type {}".format(block_id, cubit_element_type)
-            )
+            geometry_string = geometry_type.get_cubit_string()
+
+            # Create the block and set the meshing scheme and element type.
+            # These commands are sent to cubit together with the name of the
+            # block.
+            create_commands = [
+                f"create block {block_id}",
+                f"{geometry_string} {item_id} scheme {cubit_scheme}",
+                f"block {block_id} {geometry_string} {item_id}",
+                f"block {block_id} element type {cubit_element_type}",
+            ]
         else:
+            self.cubit.cmd(f"create block {block_id}")
             item.add_to_block(block_id, el_type)
+            create_commands = []
 
-        self._name_created_set("block", block_id, name, item)
+        self._name_created_set("block", block_id, name, item, create_commands)
 
         # If the user does not give a bc_description, load the default one.
         if not bc_description:
@@ -232,7 +390,7 @@ class CubitPy(object):
 
         # Delete all blocks.
         for block_id in self.get_block_id_list():
-            self.cmd("delete Block {}".format(block_id))
+            self.cmd(f"delete Block {block_id}")
 
     def add_node_set(
         self,
@@ -270,27 +428,32 @@ class CubitPy(object):
         """
 
         # Check and get the node set id for the new node set.
+        node_set_id_list, item_id = self._get_id_list_and_item_id(
+            "get_nodeset_id_list", item
+        )
         node_set_id = _get_and_check_ids(
-            "nodeset", self.node_sets, self.cubit.get_nodeset_id_list(), node_set_id
+            "nodeset", self.node_sets, node_set_id_list, node_set_id
         )
 
         # Get element type of item if it was not explicitly given.
         if geometry_type is None:
             geometry_type = item.get_geometry_type()
 
-        self.cubit.cmd("create nodeset {}".format(node_set_id))
         if not isinstance(item, CubitGroup):
-            # Add the geometries to the node set in cubit.
-            self.cubit.cmd(
-                "nodeset {} {} {}".format(
-                    node_set_id, geometry_type.get_cubit_string(), item.id()
-                )
-            )
+            # Create the node set and add the geometries to it in cubit. These
+            # commands are sent to cubit together with the name of the node
+            # set.
+            create_commands = [
+                f"create nodeset {node_set_id}",
+                f"nodeset {node_set_id} {geometry_type.get_cubit_string()} {item_id}",
+            ]
         else:
             # Add the group to the node set in cubit.
+            self.cubit.cmd(f"create nodeset {node_set_id}")
             item.add_to_nodeset(node_set_id)
+            create_commands = []
 
-        self._name_created_set("nodeset", node_set_id, name, item)
+        self._name_created_set("nodeset", node_set_id, name, item, create_commands)
 
         # Add data that will be written to bc file.
         if (
@@ -316,20 +479,21 @@ class CubitPy(object):
         """Get a list with all available cubit objects of a certain geometry
         type."""
 
-        if geometry_type == cupy.geometry.vertex:
-            funct = self.vertex
-        elif geometry_type == cupy.geometry.curve:
-            funct = self.curve
-        elif geometry_type == cupy.geometry.surface:
-            funct = self.surface
-        elif geometry_type == cupy.geometry.volume:
-            funct = self.volume
-        else:
+        # The name of the cubit function that returns an item of this type is
+        # the same as the cubit string of the geometry type.
+        if not isinstance(geometry_type, GeometryType):
             raise ValueError("Got unexpected geometry type!")
+        funct_name = geometry_type.get_cubit_string()
 
         if item_ids is None:
             item_ids = self.get_ids(geometry_type)
-        return [funct(index) for index in item_ids]
+        if not item_ids:
+            return []
+
+        # Get all items with a single call to cubit.
+        return self.call_batch(
+            [[self.cubit, funct_name, [index]] for index in item_ids]
+        )
 
     def set_line_interval(self, item, n_el):
         """Set the number of elements along a line.
@@ -345,18 +509,18 @@ class CubitPy(object):
         # Check if item is line.
         if not item.get_geometry_type() == cupy.geometry.curve:
             raise TypeError("Expected line, got {}".format(type(item)))
-        self.cubit.cmd("curve {} interval {} scheme equal".format(item.id(), n_el))
+        self.cubit.cmd(f"curve {item.id()} interval {n_el} scheme equal")
 
     def export_cub(self, path):
         """Export the cubit input."""
         if cupy.is_coreform():
             self.cubit.cmd(f'save cub5 "{path}" overwrite journal')
         else:
-            self.cubit.cmd('save as "{}" overwrite'.format(path))
+            self.cubit.cmd(f'save as "{path}" overwrite')
 
     def export_exo(self, path):
         """Export the mesh."""
-        self.cubit.cmd('export mesh "{}" dimension 3 overwrite'.format(path))
+        self.cubit.cmd(f'export mesh "{path}" dimension 3 overwrite')
 
     def dump(self, yaml_path, mesh_in_exo=False):
         """Create the yaml file and save it in under provided yaml_path.
@@ -373,6 +537,8 @@ class CubitPy(object):
             Default is False.
         """
 
+        import netCDF4
+
         # Check if output path exists
         yaml_dir = os.path.dirname(os.path.abspath(yaml_path))
         if not os.path.exists(yaml_dir):
@@ -515,56 +681,49 @@ class CubitPy(object):
         labels: [GeometryType, FiniteElementObject]
             What kind of labels should be shown in cubit.
         delay: float
-            Time (in seconds) to wait after sending the write command until the
-            new cubit session is opened.
+            Maximum time (in seconds) to wait after sending the write command
+            for the state file to be written, before the new cubit session is
+            opened.
         testing: bool
             If this is true, cubit will not be opened, instead the created
             journal and command will re returned.
         """
 
-        # Export the cubit state. After the export, we wait, to ensure that the
-        # write operation finished, and the state file can be opened cleanly
-        # (in some cases the creation of the state file takes to long and in
-        # the subsequent parts of this code we open a file that is not yet
-        # fully written to disk).
-        # TODO: find a way to do this without the wait command, but to check if
-        # the file is readable.
+        import subprocess  # nosec B404
+
+        # Export the cubit state. After the export, we wait until the size of
+        # the state file does not change anymore, to ensure that the write
+        # operation finished, and the state file can be opened cleanly (in some
+        # cases the creation of the state file takes to long and in the
+        # subsequent parts of this code we open a file that is not yet fully
+        # written to disk). An old state file is removed before the export, so
+        # it is not mistaken for the new one.
         os.makedirs(cupy.temp_dir, exist_ok=True)
         if cupy.is_coreform():
             state_path = os.path.join(cupy.temp_dir, "state.cub5")
         else:
             state_path = os.path.join(cupy.temp_dir, "state.cub")
+        try:
+            os.remove(state_path)
+        except FileNotFoundError:
+            pass
         self.export_cub(state_path)
-        time.sleep(delay)
+        _wait_for_file(state_path, delay)
 
         # Write file that opens the state in cubit.
         journal_path = os.path.join(cupy.temp_dir, "open_state.jou")
+        # Get the cubit names of the desired display items.
+        cubit_names = {label.get_cubit_string() for label in labels}
+
+        # Label items in cubit, per default all labels are deactivated.
+        journal_lines = [f'open "{state_path}"']
+        journal_lines.extend(
+            f"label {item} {'On' if item in cubit_names else 'Off'}"
+            for item in CUBIT_LABELS
+        )
+        journal_lines.append("display")
         with open(journal_path, "w") as journal:
-            journal.write('open "{}"\n'.format(state_path))
-
-            # Get the cubit names of the desired display items.
-            cubit_names = [label.get_cubit_string() for label in labels]
-
-            # Label items in cubit, per default all labels are deactivated.
-            cubit_labels = [
-                "volume",
-                "surface",
-                "curve",
-                "vertex",
-                "hex",
-                "tet",
-                "face",
-                "tri",
-                "edge",
-                "node",
-            ]
-            for item in cubit_labels:
-                if item in cubit_names:
-                    on_off = "On"
-                else:
-                    on_off = "Off"
-                journal.write("label {} {}\n".format(item, on_off))
-            journal.write("display\n")
+            journal.write("\n".join(journal_lines) + "\n")
 
         # Get the command and arguments to open cubit with.
         cubit_command = [
@@ -35,18 +35,11 @@ class GeometryType(Enum):
     volume = auto()
 
     def get_cubit_string(self):
-        """Return the string that represents this item in cubit."""
+        """Return the string that represents this item in cubit.
 
-        if self == self.vertex:
-            return "vertex"
-        elif self == self.curve:
-            return "curve"
-        elif self == self.surface:
-            return "surface"
-        elif self == self.volume:
-            return "volume"
-        else:
-            raise ValueError("Got unexpected type {}!".format(self))
+        The names of the members are the strings used in cubit.
+        """
+        return self.name
 
     def get_dat_bc_section_string(self):
         """Return the string that represents this item in a dat file
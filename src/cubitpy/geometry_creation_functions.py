@@ -40,11 +40,8 @@ def create_spline_interpolation_curve(cubit, vertices, *, delete_points=True):
     # Create the vertices
     vertices = [cubit.create_vertex(*vertex) for vertex in vertices]
     vertices_ids = [str(vertex.id()) for vertex in vertices]
-    cubit.cmd(
-        "create curve spline vertex {} {}".format(
-            " ".join(vertices_ids), ("delete" if delete_points else "")
-        )
-    )
+    delete_string = "delete" if delete_points else ""
+    cubit.cmd(f"create curve spline vertex {' '.join(vertices_ids)} {delete_string}")
     return cubit.curve(cubit.get_last_id(cupy.geometry.curve))
 
 
@@ -160,15 +157,11 @@ def create_parametric_surface(
     # Create the surface.
     curve_u_ids = " ".join([str(curve.id()) for curve in curves[0]])
     curve_v_ids = " ".join([str(curve.id()) for curve in curves[1]])
-    cubit.cmd(
-        "create surface net U curve {} V curve {} noheal".format(
-            curve_u_ids, curve_v_ids
-        )
-    )
+    cubit.cmd(f"create surface net U curve {curve_u_ids} V curve {curve_v_ids} noheal")
 
     if delete_curves:
         for id_string in [curve_u_ids, curve_v_ids]:
-            cubit.cmd("delete curve {}".format(id_string))
+            cubit.cmd(f"delete curve {id_string}")
 
     return cubit.surface(cubit.get_last_id(cupy.geometry.surface))
 
@@ -24,6 +24,7 @@
 import numpy as np
 
 from cubitpy.conf import cupy
+from cubitpy.cubit_utility import get_id_string
 
 
 def create_brick(
@@ -95,22 +96,18 @@ def create_brick(
 
         # Set the number of elements in x, y and z direction.
         for direction in range(3):
-            string = ""
-            for curve in dir_curves[direction]:
-                string += " {}".format(curve.id())
+            string = "".join(f" {curve.id()}" for curve in dir_curves[direction])
             cubit.cmd(
-                "curve {} interval {} scheme equal".format(
-                    string, mesh_interval[direction]
-                )
+                f"curve {string} interval {mesh_interval[direction]} scheme equal"
             )
 
     if mesh_factor is not None:
         # Set a cubit factor for the mesh size.
-        cubit.cmd("volume {} size auto factor {}".format(volume_id, mesh_factor))
+        cubit.cmd(f"volume {volume_id} size auto factor {mesh_factor}")
 
     # Mesh the created block.
     if mesh:
-        cubit.cmd("mesh volume {}".format(volume_id))
+        cubit.cmd(f"mesh volume {volume_id}")
 
     return solid
 
@@ -268,9 +265,7 @@ def extrude_mesh_normal_to_surface(
     # volume.
     ball_hex_ids = range(n_elements_old + 1, n_elements_old + n_quads * n_layer + 1)
     cubit.cmd(
-        "create mesh geometry hex {} feature_angle 135.0".format(
-            " ".join(map(str, ball_hex_ids))
-        )
+        f"create mesh geometry hex {get_id_string(ball_hex_ids)} feature_angle 135.0"
     )
     last_id = cubit.get_entities(cupy.geometry.volume)[-1]
     return cubit.volume(last_id)
@@ -21,9 +21,11 @@
 # THE SOFTWARE.
 """This script is used to test the functionality of the cubitpy module."""
 
+import copy
 import os
 import shutil
 import subprocess
+import time
 
 import numpy as np
 import pytest
@@ -38,8 +40,18 @@ testing_external_geometry = os.path.join(testing_path, "external-geometry")
 
 # CubitPy imports.
 from cubitpy.conf import cupy
-from cubitpy.cubit_utility import get_surface_center, import_fluent_geometry
-from cubitpy.cubitpy import CubitPy
+from cubitpy.cubit_utility import (
+    get_id_string,
+    get_surface_center,
+    import_fluent_geometry,
+)
+from cubitpy.cubit_to_fourc_input import (
+    get_block_connectivity_list,
+    get_element_connectivity_list,
+)
+from cubitpy.cubit_wrapper.cubit_wrapper_host import serialize_item
+from cubitpy.cubit_wrapper.cubit_wrapper_utility import is_base_type
+from cubitpy.cubitpy import CubitPy, _wait_for_file
 from cubitpy.geometry_creation_functions import (
     create_brick_by_corner_points,
     create_parametric_surface,
@@ -1388,6 +1400,28 @@ def test_groups_multiple_sets(group_get_by):
     compare_yaml(cubit)
 
 
+def test_group_add_list_order():
+    """Test that the items of a list are added to a group in the given
+    order."""
+
+    cubit = CubitPy()
+    volume_1 = cubit.brick(1, 1, 1).volumes()[0]
+    volume_2 = cubit.brick(1, 1, 1).volumes()[0]
+
+    # The string is executed after the volumes are added to the group.
+    group = cubit.group()
+    group.add([volume_1, volume_2, f"remove volume {volume_2.id()}"])
+    assert list(group.get_item_ids_from_type(cupy.geometry.volume)) == [volume_1.id()]
+
+    # Items before an invalid item are added to the group.
+    group = cubit.group()
+    with pytest.raises(TypeError):
+        group.add([volume_1, [volume_2], 1.0, volume_2])
+    assert sorted(group.get_item_ids_from_type(cupy.geometry.volume)) == sorted(
+        [volume_1.id(), volume_2.id()]
+    )
+
+
 def test_reset_block():
     """Test that the block counter can be reset in cubit."""
 
@@ -1459,6 +1493,21 @@ def test_get_node_id_function():
     assert node_ids == [15]
 
 
+def test_copy_cubitpy():
+    """Test that copies of a CubitPy object are CubitPy objects, that use the
+    same cubit objects as the original one."""
+
+    cubit = CubitPy()
+    brick = cubit.brick(1, 1, 1)
+
+    for copy_function in (copy.copy, copy.deepcopy):
+        cubit_copy = copy_function(cubit)
+        assert type(cubit_copy) is CubitPy
+        assert cubit_copy.cubit is cubit.cubit
+        assert copy_function(brick) is brick
+        assert len(cubit_copy.get_entities("volume")) == 1
+
+
 def test_serialize_nested_lists():
     """Test that nested lists can be send to cubit correctly."""
 
@@ -1495,6 +1544,57 @@ def test_serialize_geometry_types():
     assert 0.0 == pytest.approx(np.linalg.norm(bounding_box - bounding_box_ref), 1e-10)
 
 
+def test_is_base_type():
+    """Test the check for types that are sent between the python interpreters
+    without conversion."""
+
+    class DerivedInt(int):
+        pass
+
+    class DerivedStr(str):
+        pass
+
+    for item in [1, 1.5, "a", True, None, DerivedInt(2), DerivedStr("b")]:
+        assert is_base_type(item)
+    for item in [[1], (1,), {"a": 1}, object()]:
+        assert not is_base_type(item)
+
+
+def test_serialize_item():
+    """Test the serialization of arguments that are sent to cubit."""
+
+    # Plain python types are sent directly.
+    for item in [1, 1.5, "volume", None]:
+        assert serialize_item(item) is item
+
+    # Numpy arrays and scalars are converted to python types.
+    item = serialize_item(np.array([[1, 2], [3, 4]], dtype=np.int32))
+    assert item == [[1, 2], [3, 4]]
+    assert type(item[0][0]) is int
+    item = serialize_item([np.float64(1.5), np.int64(2)])
+    assert item == [1.5, 2]
+    assert [type(value) for value in item] == [float, int]
+
+    # Nested lists and geometry types.
+    assert serialize_item([1, [cupy.geometry.curve, (np.int64(3), "b")]]) == [
+        1,
+        ["curve", [3, "b"]],
+    ]
+
+
+def test_serialize_flat_lists():
+    """Test that flat argument lists are sent to cubit as lists."""
+
+    for item in [(1, 2.0, "a"), [1, None], ()]:
+        serialized_item = serialize_item(item)
+        assert type(serialized_item) is list
+        assert serialized_item == list(item)
+
+    # A serialized list is a copy of the given list.
+    item = [1, 2, 3]
+    assert serialize_item(item) is not item
+
+
 def test_mesh_import():
     """Test that the cubit class MeshImport works properly.
 
@@ -1568,6 +1668,23 @@ def test_display_in_cubit():
     assert journal_text.strip() == ref_text.strip()
 
 
+def test_wait_for_file(tmp_path):
+    """Test that waiting for a file returns once the file is written, and
+    after the timeout if the file is not created."""
+
+    # A file that does not exist is waited for until the timeout.
+    path = tmp_path / "state.cub"
+    start_time = time.monotonic()
+    _wait_for_file(path, 0.1)
+    assert time.monotonic() - start_time >= 0.1
+
+    # A written file is found directly.
+    path.write_text("state")
+    start_time = time.monotonic()
+    _wait_for_file(path, 10.0)
+    assert time.monotonic() - start_time < 5.0
+
+
 def test_create_parametric_surface():
     """Test the create_parametric_surface function."""
 
@@ -1704,6 +1821,113 @@ def test_create_brick_by_corner_points():
     compare_yaml(cubit)
 
 
+def test_get_id_string():
+    """Test the conversion of ID lists to strings for cubit commands."""
+
+    # Short lists are converted directly.
+    assert get_id_string(5) == "5"
+    assert get_id_string([3, 1, 2]) == "3 1 2"
+    assert get_id_string(np.array([1, 2, 3])) == "1 2 3"
+    assert get_id_string([2, 2, 1]) == "2 2 1"
+    assert get_id_string(range(1, 17)) == " ".join(str(i) for i in range(1, 17))
+
+    # Long lists are converted to the cubit range syntax.
+    assert get_id_string(range(1, 18)) == "1 to 17"
+    assert get_id_string(range(1, 101)) == "1 to 100"
+    assert (
+        get_id_string(list(range(1, 30)) + [35, 40, 41, 42] + list(range(100, 120)))
+        == "1 to 29 35 40 to 42 100 to 119"
+    )
+
+    # The order of the IDs and duplicates are kept on both sides of the
+    # threshold.
+    assert (
+        get_id_string(list(range(1, 30)) + [42, 41, 41, 40] + list(range(100, 120)))
+        == "1 to 29 42 41 41 40 100 to 119"
+    )
+
+
+def test_set_temp_dir(tmp_path):
+    """Test that the temporary directory can be set and is created once it is
+    accessed."""
+
+    temp_dir = cupy.temp_dir
+    try:
+        new_temp_dir = tmp_path / "cubitpy_temp"
+        cupy.temp_dir = str(new_temp_dir)
+        assert not new_temp_dir.exists()
+        assert cupy.temp_log == str(new_temp_dir / "cubitpy.log")
+        assert new_temp_dir.is_dir()
+    finally:
+        cupy.temp_dir = temp_dir
+
+
+def test_get_block_connectivity_list():
+    """Test the conversion of the connectivity of a whole block."""
+
+    # Node ordering for hex27 elements in 4C, given per element.
+    hex27_ordering = list(range(20)) + [21, 25, 24, 26, 23, 22, 20]
+
+    rng = np.random.default_rng(seed=1)
+    hex27_block = rng.permutation(3 * 27).reshape(3, 27) + 1
+    hex27_ref = [[element[i] for i in hex27_ordering] for element in hex27_block]
+    assert get_block_connectivity_list(hex27_block) == hex27_ref
+    for element, element_ref in zip(hex27_block, hex27_ref):
+        assert get_element_connectivity_list(element) == element_ref
+
+    # All other elements keep the ordering from cubit.
+    hex8_block = rng.permutation(4 * 8).reshape(4, 8) + 1
+    assert get_block_connectivity_list(hex8_block) == hex8_block.tolist()
+    assert get_element_connectivity_list(hex8_block[2]) == hex8_block[2].tolist()
+
+    # The returned lists contain python integers.
+    assert type(get_block_connectivity_list(hex27_block)[0][0]) is int
+
+
+def test_reuse_connection():
+    """Test that the connection to cubit is reused for a new CubitPy object,
+    if requested."""
+
+    cubit = CubitPy(reuse_connection=True)
+    cubit_connect = cubit.cubit.cubit_connect
+    cubit.brick(1, 1, 1)
+    assert len(cubit.get_entities("volume")) == 1
+    del cubit
+
+    # The new object uses the same connection, and cubit is reset.
+    cubit = CubitPy(reuse_connection=True)
+    assert cubit.cubit.cubit_connect is cubit_connect
+    assert len(cubit.get_entities("volume")) == 0
+
+    # Objects without the flag always start a new session.
+    assert CubitPy().cubit.cubit_connect is not cubit_connect
+
+
+def test_reuse_connection_holders():
+    """Test that a connection to cubit is only reused once no copy of the
+    CubitPy object and no cubit object from the connection exist anymore."""
+
+    cubit = CubitPy(reuse_connection=True)
+    cubit_connect = cubit.cubit.cubit_connect
+    cubit_copy = copy.copy(cubit)
+    volume = cubit.brick(1, 1, 1)
+    del cubit
+
+    # The copy still uses the connection.
+    cubit_other = CubitPy(reuse_connection=True)
+    assert cubit_other.cubit.cubit_connect is not cubit_connect
+    del cubit_copy
+
+    # The cubit object still uses the connection.
+    cubit_other_2 = CubitPy(reuse_connection=True)
+    assert cubit_other_2.cubit.cubit_connect is not cubit_connect
+    del volume
+
+    # Now the connection is free again.
+    cubit = CubitPy(reuse_connection=True)
+    assert cubit.cubit.cubit_connect is cubit_connect
+
+
 def setup_and_check_import_fluent_geometry(
     fluent_geometry, feature_angle, reference_entities_number
 ):